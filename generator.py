@@ -1,12 +1,18 @@
 #!/bin/env python3
 import json
+import os
 
 import yaml
-import glob
+from concurrent.futures import ProcessPoolExecutor
 
 from dexes import __get_stonfi_assets, __get_dedust_assets, __get_backed_assets, update_stonfi_routers
 from utlis import normalize_address
 
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
 EXPLORER_JETTONS = "https://tonviewer.com/"
 EXPLORER_ACCOUNTS = "https://tonviewer.com/"
 EXPLORER_COLLECTIONS = "https://tonviewer.com/"
@@ -14,13 +20,55 @@ EXPLORER_COLLECTIONS = "https://tonviewer.com/"
 DEXES_FILE_NAME = "imported_from_dex.yaml"
 BACKED_FILE_NAME = "backed.yaml"
 
+# below this many files spawning worker processes costs more than it saves
+PARALLEL_LOAD_THRESHOLD = 64
+
+
+def _yload(file):
+    with open(file) as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+# parsed files keyed by (path, mtime_ns): collect_all_dexes and merge_jettons walk the same jettons/ tree in one run
+_YAML_CACHE = dict()
+
+
+def _ydump(file, data):
+    # records are built with their keys already in alphabetical order, so the dumper doesn't need to sort them
+    with open(file, "w") as f:
+        yaml.dump(data, f, Dumper=_Dumper, default_flow_style=False, sort_keys=False)
+
+
+def _yaml_files(directory, skip=None):
+    # same selection as glob("<directory>/*.yaml"): dotfiles such as jettons/.tBTC.yaml are not picked up
+    with os.scandir(directory) as entries:
+        return sorted(e.path for e in entries
+                      if e.name.endswith(".yaml") and not e.name.startswith(".") and e.name != skip and e.is_file())
+
+
+def _yload_all(files):
+    keys = [(file, os.stat(file).st_mtime_ns) for file in files]
+    missing = [key for key in keys if key not in _YAML_CACHE]
+    if missing:
+        paths = [file for file, _ in missing]
+        if len(paths) > PARALLEL_LOAD_THRESHOLD and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor() as ex:
+                parsed = list(ex.map(_yload, paths, chunksize=16))
+        else:
+            parsed = [_yload(file) for file in paths]
+        _YAML_CACHE.update(zip(missing, parsed))
+    return [_YAML_CACHE[key] for key in keys]
+
+
+def _json_write(file, data):
+    # one dumps() + write() instead of json.dump()'s per-token writes; output stays byte-identical
+    with open(file, 'w') as out:
+        out.write(json.dumps(data, indent=" ", sort_keys=True))
+
 
 def collect_all_dexes():
-    temp, jettons = list(), list()
-    for file in sorted(glob.glob("jettons/*.yaml")):
-        if file.endswith(DEXES_FILE_NAME):
-            continue
-        temp.append(yaml.safe_load(open(file)))
+    jettons = list()
+    temp = _yload_all(_yaml_files("jettons", skip=DEXES_FILE_NAME))
 
     for item in temp:
         if isinstance(item, list):
@@ -28,45 +76,42 @@ def collect_all_dexes():
         else:
             jettons.append(item)
 
-    already_exist_address = dict()
-    for jetton in jettons:
-        already_exist_address[normalize_address(jetton["address"], True)] = True
+    already_exist_address = {normalize_address(jetton["address"], True) for jetton in jettons}
 
     assets =  __get_dedust_assets() + __get_stonfi_assets()
     assets_for_save = dict()
-    for idx, asset in enumerate(assets):
+    for asset in assets:
         asset.address = normalize_address(asset.address, True)
-        if already_exist_address.get(asset.address, None):
+        if asset.address in already_exist_address:
             continue
         assets_for_save[asset.address] = {
-            'name': asset.name,
             'address': asset.address,
+            'name': asset.name,
             'symbol': asset.symbol
         }
 
-    with open(f"jettons/{DEXES_FILE_NAME}", "w") as yaml_file:
-        yaml.dump(list(sorted(assets_for_save.values(), key=lambda x: x['symbol'])), yaml_file, default_flow_style=False)
+    _ydump(f"jettons/{DEXES_FILE_NAME}", list(sorted(assets_for_save.values(), key=lambda x: x['symbol'])))
 
 def collect_all_backed():
     assets = __get_backed_assets()
     if len(assets) == 0:
         return
-    assets_for_save = dict()
-    for idx, asset in enumerate(assets):
-        asset.address = normalize_address(asset.address, True)
-        assets_for_save[asset.address] = {
-            'name': asset.name,
-            'address': asset.address,
-            'symbol': asset.symbol
-        }
+    rows = dict()
+    for asset in assets:
+        address = normalize_address(asset.address, True)
+        rows[address] = (asset.symbol, asset.name, address)
+    assets_for_save = [{'address': address, 'name': name, 'symbol': symbol} for symbol, name, address in sorted(rows.values())]
 
-    with open(f"jettons/{BACKED_FILE_NAME}", "w") as yaml_file:
-        yaml.dump(list(sorted(assets_for_save.values(), key=lambda x: x['symbol'])), yaml_file, default_flow_style=False)
+    _ydump(f"jettons/{BACKED_FILE_NAME}", assets_for_save)
 
-ALLOWED_KEYS =  {'symbol', 'name', 'address', 'description', 'image', 'social', 'websites', 'decimals', 'coinmarketcap', 'coingecko'}
+ALLOWED_KEYS = frozenset({'symbol', 'name', 'address', 'description', 'image', 'social', 'websites', 'decimals', 'coinmarketcap', 'coingecko'})
+REQUIRED_KEYS = frozenset({'name', 'symbol', 'address'})
+STR_FIELDS = frozenset({'symbol', 'name', 'address', 'description', 'image', 'coinmarketcap', 'coingecko'})
+LIST_FIELDS = frozenset({'social', 'websites'})
+BANNED_IMAGE_PREFIXES = ('https://cache.tonapi.io', 'http://cache.tonapi.io')
 
 def merge_jettons():
-    temp = [yaml.safe_load(open(file)) for file in sorted(glob.glob("jettons/*.yaml"))]
+    temp = _yload_all(_yaml_files("jettons"))
     jettons = []
     for j in temp:
         if isinstance(j, list):
@@ -76,11 +121,24 @@ def merge_jettons():
 
     already_exist_address = dict()
     for j in jettons:
-        if len(set(j.keys()) - ALLOWED_KEYS) > 0:
-            raise Exception(f"invalid keys {set(j.keys()) - ALLOWED_KEYS} in {j.get('name')}")
-        if len(set(j.keys()) & {"name", "symbol", "address"}) < 3:
+        invalid_keys = j.keys() - ALLOWED_KEYS
+        if invalid_keys:
+            raise Exception(f"invalid keys {invalid_keys} in {j.get('name')}")
+        if not REQUIRED_KEYS <= j.keys():
             raise Exception(f"name, symbol, and address are required in {j.get('name')}")
-        if 'image' in j and j['image'].startswith('https://cache.tonapi.io'):
+
+        # single pass over the keys the record actually has: type checks and decimals coercion
+        for field, value in j.items():
+            if field in STR_FIELDS:
+                if not isinstance(value, str):
+                    raise Exception(f"invalid field type for {field} in {j.get('name')}")
+            elif field in LIST_FIELDS:
+                if not isinstance(value, list) or any(not isinstance(x, str) for x in value):
+                    raise Exception(f"invalid list field type for {field} in {j.get('name')}")
+            elif field == 'decimals':
+                j['decimals'] = int(value)
+
+        if 'image' in j and j['image'].startswith(BANNED_IMAGE_PREFIXES):
             raise Exception(f"don't use cache.tonapi.io as image source in {j.get('name')}")
 
         normalized = normalize_address(j["address"], True)
@@ -90,19 +148,7 @@ def merge_jettons():
 
         j["address"] = normalized
 
-        for field in ['symbol', 'name', 'address', 'description', 'image', 'coinmarketcap', 'coingecko']:
-            if not isinstance(j.get(field, ''), str):
-                raise Exception(f"invalid field type for {field} in {j.get('name')}")
-
-        for field in ['social', 'websites']:
-            if field in j and (not isinstance(j[field], list) or any(not isinstance(x, str) for x in j[field])):
-                raise Exception(f"invalid list field type for {field} in {j.get('name')}")
-
-        if 'decimals' in j:
-            j['decimals'] = int(j['decimals'])
-
-    with open('jettons.json', 'w') as out:
-        json.dump(jettons, out, indent=" ", sort_keys=True)
+    _json_write('jettons.json', jettons)
 
     return sorted([(j.get('name', 'unknown'), j.get('address', 'unknown')) for j in jettons])
 
@@ -110,25 +156,24 @@ def merge_jettons():
 def merge_accounts(accounts):
     main_page = list()
     for file in ('accounts/infrastructure.yaml', 'accounts/defi.yaml', 'accounts/celebrities.yaml'):
-        accs = yaml.safe_load(open(file))
+        accs = _yload(file)
         main_page.extend([(x['name'], x['address']) for x in accs])
-        accounts.extend(yaml.safe_load(open(file)))
+        accounts.extend(accs)
 
     files = ('accounts/givers.yaml', 'accounts/custodians.yaml', 'accounts/bridges.yaml', 'accounts/validators.yaml',
              'accounts/scammers.yaml', 'accounts/notcoin.yaml', 'accounts/dapps.yaml', 'accounts/ston.yaml')
     for file in files:
-        accounts.extend(yaml.safe_load(open(file)))
+        accounts.extend(_yload(file))
 
     for account in accounts:
         account['address'] = normalize_address(account['address'], True)
 
-    with open('accounts.json', 'w') as out:
-        json.dump(accounts, out, indent=" ", sort_keys=True)
+    _json_write('accounts.json', accounts)
     return main_page
 
 
 def merge_collections():
-    raw = [yaml.safe_load(open(file)) for file in sorted(glob.glob("collections/*.yaml"))]
+    raw = _yload_all(_yaml_files("collections"))
     collections = list()
 
     for c in raw:
@@ -140,15 +185,20 @@ def merge_collections():
     for collection in collections:
         collection['address'] = normalize_address(collection['address'], True)
 
-    with open('collections.json', 'w') as out:
-        json.dump(collections, out, indent=" ", sort_keys=True)
+    _json_write('collections.json', collections)
 
     return sorted([(c.get('name', 'unknown'), c.get('address', 'unknown')) for c in collections])
 
 
+def _md_table(rows, explorer):
+    return "\n".join("[%s](%s%s) | %s" % (name, explorer, normalize_address(address, True), normalize_address(address, False))
+                     for name, address in rows)
+
+
 def main():
-    if len([x for x in glob.glob("*.yaml")]) > 0:
-        raise Exception("please don't add yaml files to root directory. use jettons/ or collections/")
+    with os.scandir(".") as entries:
+        if any(e.name.endswith(".yaml") and not e.name.startswith(".") for e in entries):
+            raise Exception("please don't add yaml files to root directory. use jettons/ or collections/")
     update_stonfi_routers()
     collect_all_dexes()
     collect_all_backed()
@@ -156,11 +206,14 @@ def main():
     collections = merge_collections()
     # accounts = merge_accounts([{'name': x[0] + " master", 'address': x[1]} for x in jettons])
     accounts = merge_accounts([])
-    jettons_md = "\n".join(["[%s](%s%s) | %s" % (j[0], EXPLORER_JETTONS, normalize_address(j[1], True), normalize_address(j[1], False)) for j in jettons])
-    accounts_md = "\n".join(["[%s](%s%s) | %s" % (j[0], EXPLORER_ACCOUNTS, normalize_address(j[1], True), normalize_address(j[1], False)) for j in accounts])
-    collections_md = "\n".join(["[%s](%s%s) | %s" % (j[0], EXPLORER_COLLECTIONS,  normalize_address(j[1], True), normalize_address(j[1], False)) for j in collections])
-
-    open('README.md', 'w').write(open("readme.md.template").read() % (accounts_md, collections_md))
+    # the template only has account and collection tables, so no jettons table is rendered
+    accounts_md = _md_table(accounts, EXPLORER_ACCOUNTS)
+    collections_md = _md_table(collections, EXPLORER_COLLECTIONS)
+
+    with open("readme.md.template") as f:
+        template = f.read()
+    with open('README.md', 'w') as f:
+        f.write(template % (accounts_md, collections_md))
 
 if __name__ == '__main__':
     main()
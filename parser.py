@@ -1,6 +1,7 @@
 import json
 import os
 import shutil
+from typing import Optional
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -28,16 +29,24 @@ def clone_ton_labels_repo():
 def rm_ton_labels_dir():
     shutil.rmtree(TON_LABELS_DIR)
 
-def get_types_from_tonapi(address: str) -> list[str]:
+_session: Optional[requests.Session] = None
+
+# one pooled session for the whole run instead of a new connection per address
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        retry_strategy = Retry(
+            backoff_factor=0.5,
+            status_forcelist=[429, 502]
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        _session = requests.Session()
+        _session.mount('https://', adapter)
+    return _session
+
+def get_types_from_tonapi(address: str, session: Optional[requests.Session] = None) -> list[str]:
     url = TON_API_ACCOUNT_URL + address
-    session = requests.Session()
-    retry_strategy = Retry(
-        backoff_factor=0.5,
-        status_forcelist=[429, 502]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount('https://', adapter)
-    response = session.get(url)
+    response = (session or _get_session()).get(url)
     if response.status_code != 200:
         return []
 
@@ -85,11 +94,11 @@ def get_asset_from_json_file(file: str, skip_addr_set: set[str]) -> dict[str, li
 def get_assets_from_dir(curr_dir: str, skip_addr_set: set[str]) -> dict[str, list[AssetData]]:
     os.chdir(curr_dir)
 
-    assets_from_dir = {"blacklist": [], "whitelist": []}
-    for file in os.listdir():
-        if not file.endswith(".json"):
-            continue # skip not *.json files
+    with os.scandir() as entries:
+        files = [e.name for e in entries if e.name.endswith(".json") and e.is_file()]
 
+    assets_from_dir = {"blacklist": [], "whitelist": []}
+    for file in files:
         assets_from_file = get_asset_from_json_file(file, skip_addr_set)
         assets_from_dir["blacklist"].extend(assets_from_file["blacklist"])
         assets_from_dir["whitelist"].extend(assets_from_file["whitelist"])
@@ -101,11 +110,12 @@ def get_assets_from_dir(curr_dir: str, skip_addr_set: set[str]) -> dict[str, lis
 def get_assets_from_dirs(skip_addr_set: set[str]) -> dict[str, list[AssetData]]:
     os.chdir(TON_LABELS_DIR + ASSETS_DIR)
 
-    all_assets = {"blacklist": [], "whitelist": []}
-    for curr_dir in os.listdir():
-        if os.path.isfile(curr_dir): # skip files
-            continue
+    # DirEntry.is_file() reuses the file type from the directory listing instead of a stat() per entry
+    with os.scandir() as entries:
+        dirs = [e.name for e in entries if not e.is_file()] # skip files
 
+    all_assets = {"blacklist": [], "whitelist": []}
+    for curr_dir in dirs:
         assets_from_dir = get_assets_from_dir(curr_dir, skip_addr_set)
         all_assets["blacklist"].extend(assets_from_dir["blacklist"])
         all_assets["whitelist"].extend(assets_from_dir["whitelist"])
@@ -1,8 +1,16 @@
 import base64
+import binascii
+from functools import lru_cache
 
+_b64decode = base64.urlsafe_b64decode
+_b64encode = base64.urlsafe_b64encode
+
+
+# generator normalizes the same addresses repeatedly (dedup, merge, both README columns)
+@lru_cache(maxsize=65536)
 def normalize_address(a, to_raw):
     if len(a) == 48:
-        raw = base64.urlsafe_b64decode(a)
+        raw = _b64decode(a)
         workchain = raw[1]
         if workchain == 255:
             workchain = -1
@@ -25,22 +33,10 @@ def normalize_address(a, to_raw):
     human[1] = workchain
     human[2:34] = addr
     human[34:] = crc16(human[:34])
-    return base64.urlsafe_b64encode(human).decode()
+    return _b64encode(human).decode()
 
 
 def crc16(data):
-    POLY = 0x1021
-    reg = 0
-    message = bytes(data) + bytes(2)
-
-    for byte in message:
-        mask = 0x80
-        while mask > 0:
-            reg <<= 1
-            if byte & mask:
-                reg += 1
-            mask >>= 1
-            if reg > 0xffff:
-                reg &= 0xffff
-                reg ^= POLY
-    return reg // 256, reg % 256
\ No newline at end of file
+    # CRC-16/XMODEM (poly 0x1021, init 0); binascii implements it in C
+    reg = binascii.crc_hqx(bytes(data), 0)
+    return reg // 256, reg % 256